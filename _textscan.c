@@ -0,0 +1,111 @@
+/*
+ * _textscan: single-pass byte scanner for readability statistics.
+ *
+ * scan(buf) walks a UTF-8 byte buffer once and returns
+ * (nwords, nsentences, nsyllables, ncapitals) using the same rules as the
+ * Numba scanner in streamlit_app.py:
+ *   - words are runs of non-whitespace bytes
+ *   - sentences are runs of '.', '!' or '?'
+ *   - syllables are vowel groups (aeiouy), at least one per word
+ *   - capitals are ASCII 'A'-'Z' bytes
+ *
+ * The loop body is branch-free so the compiler can keep it in registers.
+ *
+ * Build in place with:  python setup.py build_ext --inplace
+ */
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <stdint.h>
+
+enum {
+    BYTE_VOWEL = 1,
+    BYTE_SPACE = 2,
+    BYTE_SENTENCE_END = 4,
+    BYTE_CAPITAL = 8
+};
+
+static uint8_t class_tbl[256];
+
+static void
+init_class_tbl(void)
+{
+    const char *vowels = "aeiouyAEIOUY";
+    const char *spaces = " \t\n\r\x0b\x0c";
+    const char *ends = ".!?";
+    int c;
+
+    for (; *vowels; vowels++)
+        class_tbl[(uint8_t)*vowels] |= BYTE_VOWEL;
+    for (; *spaces; spaces++)
+        class_tbl[(uint8_t)*spaces] |= BYTE_SPACE;
+    for (; *ends; ends++)
+        class_tbl[(uint8_t)*ends] |= BYTE_SENTENCE_END;
+    for (c = 'A'; c <= 'Z'; c++)
+        class_tbl[c] |= BYTE_CAPITAL;
+}
+
+static PyObject *
+textscan_scan(PyObject *self, PyObject *args)
+{
+    Py_buffer view;
+    const uint8_t *p;
+    Py_ssize_t i, n;
+    Py_ssize_t nwords = 0, nsentences = 0, nsyllables = 0, ncapitals = 0;
+    Py_ssize_t word_syllables = 0;
+    unsigned in_word = 0, in_vowels = 0, in_sentence_end = 0;
+
+    if (!PyArg_ParseTuple(args, "y*:scan", &view))
+        return NULL;
+
+    p = (const uint8_t *)view.buf;
+    n = view.len;
+
+    Py_BEGIN_ALLOW_THREADS
+    for (i = 0; i < n; i++) {
+        unsigned cls = class_tbl[p[i]];
+        unsigned vowel = cls & BYTE_VOWEL;
+        unsigned space = (cls & BYTE_SPACE) >> 1;
+        unsigned end = (cls & BYTE_SENTENCE_END) >> 2;
+        /* All-ones when this byte is whitespace, zero otherwise */
+        Py_ssize_t space_mask = -(Py_ssize_t)space;
+
+        /* A finished word contributes its vowel groups, or 1 if it had none */
+        nsyllables += (word_syllables + (word_syllables == 0)) & space_mask & -(Py_ssize_t)in_word;
+        nwords += (space ^ 1) & (in_word ^ 1);
+        word_syllables = (word_syllables + (vowel & (in_vowels ^ 1))) & ~space_mask;
+        nsentences += end & (in_sentence_end ^ 1);
+        ncapitals += (cls & BYTE_CAPITAL) >> 3;
+
+        in_word = space ^ 1;
+        in_vowels = vowel;
+        in_sentence_end = end;
+    }
+    if (in_word)
+        nsyllables += word_syllables + (word_syllables == 0);
+    Py_END_ALLOW_THREADS
+
+    PyBuffer_Release(&view);
+    return Py_BuildValue("nnnn", nwords, nsentences, nsyllables, ncapitals);
+}
+
+static PyMethodDef textscan_methods[] = {
+    {"scan", textscan_scan, METH_VARARGS,
+     "scan(buf) -> (nwords, nsentences, nsyllables, ncapitals)\n\n"
+     "Count readability statistics in a single pass over a UTF-8 buffer."},
+    {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef textscan_module = {
+    PyModuleDef_HEAD_INIT,
+    "_textscan",
+    "Single-pass byte scanner for readability statistics.",
+    -1,
+    textscan_methods
+};
+
+PyMODINIT_FUNC
+PyInit__textscan(void)
+{
+    init_class_tbl();
+    return PyModule_Create(&textscan_module);
+}
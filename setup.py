@@ -0,0 +1,22 @@
+"""Build the optional _textscan C extension used for readability scoring.
+
+    python setup.py build_ext --inplace
+"""
+import sys
+
+from setuptools import Extension, setup
+
+if sys.platform == 'win32':
+    extra_compile_args = ['/O2']
+else:
+    # -march=native lets the compiler vectorize for the build machine;
+    # drop it when building a binary for other machines
+    extra_compile_args = ['-O3', '-march=native']
+
+setup(
+    name='textscan',
+    py_modules=[],
+    ext_modules=[
+        Extension('_textscan', ['_textscan.c'], extra_compile_args=extra_compile_args)
+    ],
+)
@@ -1,10 +1,29 @@
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+import asyncio
 import os
 import json
+import multiprocessing
+import re
+import threading
 import time
-from pathlib import Path
 from collections import Counter
-import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+try:
+    import _textscan
+except ImportError:
+    _textscan = None
 
 # Set page config
 st.set_page_config(
@@ -13,6 +32,82 @@ st.set_page_config(
     layout="wide"
 )
 
+# Entity patterns, compiled once at import; each kind is scanned separately
+# so the patterns never compete for the same characters
+_ENTITY_RES = {
+    'PERSON': re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b'),
+    'DATE': re.compile(r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b|\b\d{4}\b'),
+    'PERCENT': re.compile(r'\b\d+(?:\.\d+)?%\b'),
+}
+# Unique values kept per entity kind
+_ENTITY_LIMITS = {'PERSON': 5, 'DATE': 3, 'PERCENT': 5}
+
+# Batches with less text than this run in-process: spawning workers (each
+# re-imports this app, ~0.7 s) costs more than the ~0.2 s/MB of analysis
+_PARALLEL_MIN_CHARS = 8 * 1024 * 1024
+
+# Key topic tokenization: punctuation stripped in one translate() pass
+_PUNCT_TBL = str.maketrans('', '', '.,!?;:"()[]')
+_STOP = frozenset({'the', 'and', 'are', 'for', 'with', 'this', 'that', 'from', 'they', 'have', 'been', 'will', 'said', 'each', 'which', 'their', 'time', 'but', 'all', 'can', 'may', 'was', 'were', 'not', 'you', 'your'})
+
+# Classifier keywords, in priority order
+_DOCUMENT_TYPE_KEYWORDS = {
+    'Academic Paper': ['abstract', 'introduction', 'methodology', 'conclusion', 'references'],
+    'Business Document': ['executive summary', 'business', 'market', 'strategy'],
+    'Literary Work': ['chapter', 'novel', 'story'],
+}
+
+# Readability scanner: byte classes for a single pass over UTF-8 text
+_BYTE_VOWEL = 1
+_BYTE_SPACE = 2
+_BYTE_SENTENCE_END = 4
+
+if njit is not None and np is not None:
+    _BYTE_CLASSES = np.zeros(256, dtype=np.uint8)
+    _BYTE_CLASSES[list(b'aeiouyAEIOUY')] = _BYTE_VOWEL
+    _BYTE_CLASSES[list(b' \t\n\r\x0b\x0c')] = _BYTE_SPACE
+    _BYTE_CLASSES[list(b'.!?')] = _BYTE_SENTENCE_END
+
+    @njit(cache=True)
+    def _scan_readability(buf, classes):
+        """Count words, sentences and syllables (vowel groups) in one pass"""
+        nwords = 0
+        nsentences = 0
+        nsyllables = 0
+        word_syllables = 0
+        in_word = False
+        in_vowels = False
+        in_sentence_end = False
+        for byte in buf:
+            cls = classes[byte]
+            if cls & _BYTE_SPACE:
+                if in_word:
+                    nsyllables += max(word_syllables, 1)
+                in_word = False
+                in_vowels = False
+                word_syllables = 0
+            else:
+                if not in_word:
+                    nwords += 1
+                    in_word = True
+                if cls & _BYTE_VOWEL:
+                    if not in_vowels:
+                        word_syllables += 1
+                    in_vowels = True
+                else:
+                    in_vowels = False
+            if cls & _BYTE_SENTENCE_END:
+                if not in_sentence_end:
+                    nsentences += 1
+                in_sentence_end = True
+            else:
+                in_sentence_end = False
+        if in_word:
+            nsyllables += max(word_syllables, 1)
+        return nwords, nsentences, nsyllables
+else:
+    _scan_readability = None
+
 def check_dependencies():
     """Check if optional dependencies are available"""
     deps = {
@@ -21,6 +116,12 @@ def check_dependencies():
         'textstat': False
     }
     
+    try:
+        import pymupdf
+        deps['pdf'] = True
+    except ImportError:
+        pass
+    
     try:
         import PyPDF2
         deps['pdf'] = True
@@ -33,24 +134,39 @@ def check_dependencies():
     except ImportError:
         pass
     
-    try:
-        import textstat
+    # The Numba or C readability scanner makes textstat unnecessary
+    if readability_scanner_available():
         deps['textstat'] = True
-    except ImportError:
-        pass
+    else:
+        try:
+            import textstat
+            deps['textstat'] = True
+        except ImportError:
+            pass
     
     return deps
 
-def extract_pdf_text(file_path):
-    """Extract text from PDF"""
+def extract_pdf_text(source):
+    """Extract text from a PDF path or binary stream (PyMuPDF when installed, PyPDF2 otherwise)"""
     try:
-        import PyPDF2
-        with open(file_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-        return text.strip()
+        import pymupdf
+    except ImportError:
+        pymupdf = None
+    
+    try:
+        if pymupdf is not None:
+            # Native MuPDF extraction is much faster than pure-Python PyPDF2
+            if isinstance(source, (str, os.PathLike)):
+                doc = pymupdf.open(source)
+            else:
+                doc = pymupdf.open(stream=source, filetype='pdf')
+            with doc:
+                pages = [page.get_text() for page in doc]
+        else:
+            import PyPDF2
+            reader = PyPDF2.PdfReader(source)
+            pages = [page.extract_text() for page in reader.pages]
+        return "\n".join(pages).strip()
     except ImportError:
         st.warning("⚠️ PDF extraction requires PyPDF2. Install with: pip install PyPDF2")
         return "[PDF extraction requires PyPDF2 library - install with: pip install PyPDF2]"
@@ -58,15 +174,12 @@ def extract_pdf_text(file_path):
         st.error(f"PDF extraction failed: {str(e)}")
         return f"[PDF extraction failed: {str(e)}]"
 
-def extract_docx_text(file_path):
-    """Extract text from DOCX"""
+def extract_docx_text(source):
+    """Extract text from a DOCX path or binary stream"""
     try:
         from docx import Document
-        doc = Document(file_path)
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text.strip()
+        doc = Document(source)
+        return "\n".join(paragraph.text for paragraph in doc.paragraphs).strip()
     except ImportError:
         st.warning("⚠️ DOCX extraction requires python-docx. Install with: pip install python-docx")
         return "[DOCX extraction requires python-docx library - install with: pip install python-docx]"
@@ -74,6 +187,48 @@ def extract_docx_text(file_path):
         st.error(f"DOCX extraction failed: {str(e)}")
         return f"[DOCX extraction failed: {str(e)}]"
 
+def extract_plain_text(source):
+    """Decode a TXT/MD binary stream as UTF-8"""
+    # Decode from a view of the stream's buffer rather than a getvalue() copy
+    with source.getbuffer() as buf:
+        return str(buf, 'utf-8', errors='ignore')
+
+def file_suffix(filename):
+    """Lowercased extension of filename including the dot, or '' if it has none"""
+    return '.' + filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+
+def extract_uploaded_text(uploaded_file, suffix):
+    """Extract text from an uploaded file based on its suffix"""
+    if suffix == '.pdf':
+        return extract_pdf_text(uploaded_file)
+    elif suffix == '.docx':
+        return extract_docx_text(uploaded_file)
+    else:
+        return extract_plain_text(uploaded_file)
+
+def warm_up_readability():
+    """Load (or compile) the Numba readability scanner ahead of its first real call"""
+    if _textscan is None and _scan_readability is not None:
+        # Use a read-only array like flesch_reading_ease so Numba compiles the same signature
+        _scan_readability(np.frombuffer(b' ', dtype=np.uint8), _BYTE_CLASSES)
+
+async def extract_uploaded_texts(uploaded_files, suffixes):
+    """Extract text from uploads in a worker thread while the readability scanner warms up"""
+    ctx = get_script_run_ctx()
+    
+    def extract_all():
+        # Attach the session so extractor warnings and errors still render
+        add_script_run_ctx(threading.current_thread(), ctx)
+        # One file at a time: PyMuPDF is not thread-safe and the extractors hold the GIL anyway
+        return [extract_uploaded_text(uploaded_file, suffix)
+                for uploaded_file, suffix in zip(uploaded_files, suffixes)]
+    
+    _, texts = await asyncio.gather(
+        asyncio.to_thread(warm_up_readability),
+        asyncio.to_thread(extract_all)
+    )
+    return texts
+
 def preprocess_text(text):
     """Basic text preprocessing"""
     if not text:
@@ -82,23 +237,55 @@ def preprocess_text(text):
     text = ' '.join(text.split())
     return text
 
-def classify_document_type(text):
-    """Simple document type classification"""
+def classify_document_type(text, text_lower=None):
+    """Simple document type classification (text_lower: precomputed text.lower())"""
     if not text:
         return "Unknown"
     
-    text_lower = text.lower()
+    if text_lower is None:
+        text_lower = text.lower()
     
-    if any(word in text_lower for word in ['abstract', 'introduction', 'methodology', 'conclusion', 'references']):
-        return "Academic Paper"
-    elif any(word in text_lower for word in ['executive summary', 'business', 'market', 'strategy']):
-        return "Business Document"
-    elif any(word in text_lower for word in ['chapter', 'novel', 'story']):
-        return "Literary Work"
-    elif len(text.split()) < 100:
+    # Categories in priority order; any() stops at the first keyword found
+    for doc_type, keywords in _DOCUMENT_TYPE_KEYWORDS.items():
+        if any(word in text_lower for word in keywords):
+            return doc_type
+    if len(text.split()) < 100:
         return "Short Document"
+    return "General Document"
+
+def most_common_words(words, n=5):
+    """Return the n most frequent words of an iterable, most frequent first"""
+    # Counter tallies the iterable in C, so a generator avoids an intermediate list
+    return [word for word, count in Counter(words).most_common(n)]
+
+def readability_scanner_available():
+    """Whether flesch_reading_ease has a byte scanner (C extension or Numba) to use"""
+    return _textscan is not None or _scan_readability is not None
+
+def flesch_reading_ease(text):
+    """Flesch Reading Ease computed with the _textscan C extension, or the Numba scanner"""
+    data = text.encode('utf-8', 'ignore')
+    if _textscan is not None:
+        nwords, nsentences, nsyllables, _ = _textscan.scan(data)
     else:
-        return "General Document"
+        nwords, nsentences, nsyllables = _scan_readability(np.frombuffer(data, dtype=np.uint8), _BYTE_CLASSES)
+    if nwords == 0:
+        return 0
+    nsentences = max(nsentences, 1)
+    return round(206.835 - 1.015 * (nwords / nsentences) - 84.6 * (nsyllables / nwords), 2)
+
+def first_k_unique(matches, k):
+    """Return the first k unique match texts, stopping the scan once k are found"""
+    values = []
+    if k <= 0:
+        return values
+    for match in matches:
+        value = match.group()
+        if value not in values:
+            values.append(value)
+            if len(values) == k:
+                break
+    return values
 
 def create_metadata_schema():
     """Create empty metadata schema"""
@@ -128,74 +315,78 @@ def create_metadata_schema():
         }
     }
 
-def generate_basic_metadata_from_text(text, filename):
-    """Generate basic metadata from text content"""
+def build_metadata(text, filename, file_type=None):
+    """Generate basic metadata from text content (no Streamlit calls, safe in worker processes)"""
     start_time = time.time()
     
     metadata = create_metadata_schema()
     
     # Basic file info
     metadata['basic_info']['filename'] = filename
-    metadata['basic_info']['file_type'] = Path(filename).suffix
+    metadata['basic_info']['file_type'] = file_type if file_type is not None else file_suffix(filename)
     metadata['basic_info']['processing_date'] = time.strftime('%Y-%m-%d %H:%M:%S')
     
     # Preprocess text
     text = preprocess_text(text) if text else ""
     
+    # Lowercased once, shared by the classifier and topic extraction
+    text_lower = text.lower()
+    
     # Basic content analysis
     words = text.split() if text else []
     metadata['content_analysis']['word_count'] = len(words)
     metadata['content_analysis']['character_count'] = len(text)
-    metadata['content_analysis']['document_type'] = classify_document_type(text)
+    metadata['content_analysis']['document_type'] = classify_document_type(text, text_lower)
     
-    # Try to calculate readability score
+    # Try to calculate readability score (C or Numba scanner first, textstat as fallback)
     try:
-        import textstat
-        if text and len(text.strip()) > 0:
-            metadata['content_analysis']['readability_score'] = textstat.flesch_reading_ease(text)
-        else:
+        if not text:
             metadata['content_analysis']['readability_score'] = 0
-    except ImportError:
-        metadata['content_analysis']['readability_score'] = 0
-        # Only show warning once
-        if not hasattr(st.session_state, 'textstat_warning_shown'):
-            st.warning("⚠️ For readability scores, install textstat: pip install textstat")
-            st.session_state.textstat_warning_shown = True
+        elif readability_scanner_available():
+            metadata['content_analysis']['readability_score'] = flesch_reading_ease(text)
+        else:
+            import textstat
+            metadata['content_analysis']['readability_score'] = textstat.flesch_reading_ease(text)
     except Exception:
         metadata['content_analysis']['readability_score'] = 0
     
-    # Simple summary (first 200 characters)
+    # Simple summary (first two sentences, up to 200 characters)
     if text:
-        sentences = [s.strip() for s in text.split('.') if s.strip()]
-        summary_text = '. '.join(sentences[:2]) + '.' if sentences else text[:200]
-        metadata['semantic_data']['summary'] = summary_text + "..." if len(summary_text) > 200 else summary_text
+        # Find the end of the second non-empty sentence instead of splitting the whole text
+        start = end = 0
+        sentence_count = 0
+        while sentence_count < 2:
+            period = text.find('.', end)
+            if period == -1:
+                break
+            if text[end:period].strip():
+                if not sentence_count:
+                    start = end
+                sentence_count += 1
+            end = period + 1
+        # An unterminated second sentence still belongs in the summary
+        if sentence_count == 1 and text[end:].strip():
+            end = len(text)
+        summary_text = text[start:end].strip() if sentence_count else text[:200]
+        metadata['semantic_data']['summary'] = summary_text[:200] + "..." if len(summary_text) > 200 else summary_text
     else:
         metadata['semantic_data']['summary'] = "No text content extracted"
     
     # Basic topics (most frequent meaningful words)
     if text:
-        stop_words = {'the', 'and', 'are', 'for', 'with', 'this', 'that', 'from', 'they', 'have', 'been', 'will', 'said', 'each', 'which', 'their', 'time', 'but', 'all', 'can', 'may', 'was', 'were', 'not', 'you', 'your'}
-        words_clean = [word.lower().strip('.,!?;:"()[]') for word in words if len(word) > 3 and word.lower() not in stop_words]
-        word_freq = Counter(words_clean)
-        metadata['semantic_data']['key_topics'] = [word for word, count in word_freq.most_common(5)]
+        lowered = text_lower.translate(_PUNCT_TBL)
+        words_clean = (word for word in lowered.split() if len(word) > 3 and word not in _STOP)
+        metadata['semantic_data']['key_topics'] = most_common_words(words_clean, 5)
     else:
         metadata['semantic_data']['key_topics'] = []
     
     # Basic entities (simple pattern matching)
     entities = {'PERSON': [], 'ORG': [], 'DATE': [], 'PERCENT': []}
     if text:
-        import re
-        # Find capitalized words (potential names/organizations)
-        capitalized = re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b', text)
-        entities['PERSON'] = list(set(capitalized))[:5]
-        
-        # Find dates
-        dates = re.findall(r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b|\b\d{4}\b', text)
-        entities['DATE'] = list(set(dates))[:3]
-        
-        # Find percentages
-        percentages = re.findall(r'\b\d+(?:\.\d+)?%\b', text)
-        entities['PERCENT'] = list(set(percentages))
+        # Capitalized words (potential names/organizations), dates and percentages,
+        # in order of first appearance; each scan stops once its kind is full
+        for kind, pattern in _ENTITY_RES.items():
+            entities[kind] = first_k_unique(pattern.finditer(text), _ENTITY_LIMITS[kind])
     
     metadata['semantic_data']['entities'] = entities
     
@@ -206,6 +397,36 @@ def generate_basic_metadata_from_text(text, filename):
     
     return metadata
 
+def warn_if_readability_unavailable():
+    """Warn once per session when no readability backend is installed"""
+    if readability_scanner_available():
+        return
+    try:
+        import textstat
+    except ImportError:
+        if not hasattr(st.session_state, 'textstat_warning_shown'):
+            st.warning("⚠️ For readability scores, install textstat: pip install textstat")
+            st.session_state.textstat_warning_shown = True
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def generate_basic_metadata_from_text(text, filename, file_type=None):
+    """Generate basic metadata from text content (memoized on the arguments)"""
+    warn_if_readability_unavailable()
+    return build_metadata(text, filename, file_type)
+
+def generate_metadata_batch(texts, filenames, file_types):
+    """Generate metadata for several documents in parallel worker processes"""
+    warn_if_readability_unavailable()
+    if len(texts) < 2 or sum(map(len, texts)) < _PARALLEL_MIN_CHARS:
+        return list(map(build_metadata, texts, filenames, file_types))
+    
+    # Spawn rather than fork: forking the multi-threaded Streamlit server can deadlock
+    with ProcessPoolExecutor(
+        max_workers=min(len(texts), os.cpu_count() or 1),
+        mp_context=multiprocessing.get_context('spawn')
+    ) as executor:
+        return list(executor.map(build_metadata, texts, filenames, file_types))
+
 def main():
     st.title("🔍 Automated Metadata Generation System")
     st.markdown("---")
@@ -232,7 +453,7 @@ def main():
     st.sidebar.title("Options")
     processing_mode = st.sidebar.selectbox(
         "Choose Processing Mode",
-        ["Single File Upload", "Text Input", "Sample Text Demo"]
+        ["Single File Upload", "Batch Upload", "Text Input", "Sample Text Demo"]
     )
     
     if processing_mode == "Single File Upload":
@@ -249,32 +470,49 @@ def main():
             
             if st.button("🚀 Generate Metadata", type="primary"):
                 with st.spinner("Processing file... Please wait."):
-                    # Save uploaded file temporarily
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=Path(uploaded_file.name).suffix) as tmp_file:
-                        tmp_file.write(uploaded_file.getvalue())
-                        tmp_file_path = tmp_file.name
-                    
                     try:
-                        # Extract text based on file type
-                        if uploaded_file.name.lower().endswith('.pdf'):
-                            text = extract_pdf_text(tmp_file_path)
-                        elif uploaded_file.name.lower().endswith('.docx'):
-                            text = extract_docx_text(tmp_file_path)
-                        else:
-                            text = uploaded_file.getvalue().decode('utf-8', errors='ignore')
+                        suffix = file_suffix(uploaded_file.name)
+                        
+                        # Extract text based on file type, straight from the in-memory upload,
+                        # overlapped with readability scanner warm-up
+                        text, = asyncio.run(extract_uploaded_texts([uploaded_file], [suffix]))
                         
                         # Generate metadata
-                        metadata = generate_basic_metadata_from_text(text, uploaded_file.name)
+                        metadata = generate_basic_metadata_from_text(text, uploaded_file.name, suffix)
                         
                         # Display results
                         display_metadata_results(metadata, text[:500])
                         
                     except Exception as e:
                         st.error(f"Error processing file: {str(e)}")
-                    finally:
-                        # Clean up temporary file
-                        if os.path.exists(tmp_file_path):
-                            os.unlink(tmp_file_path)
+    
+    elif processing_mode == "Batch Upload":
+        st.header("📚 Batch Upload")
+        uploaded_files = st.file_uploader(
+            "Choose files",
+            type=['txt', 'pdf', 'docx', 'md'],
+            accept_multiple_files=True,
+            help="Supported formats: TXT, PDF, DOCX, MD"
+        )
+        
+        if uploaded_files:
+            total_size = sum(uploaded_file.size for uploaded_file in uploaded_files)
+            st.info(f"**Files:** {len(uploaded_files)} | **Total size:** {total_size} bytes")
+            
+            if st.button("🚀 Generate Metadata", type="primary"):
+                with st.spinner("Processing files... Please wait."):
+                    try:
+                        filenames = [uploaded_file.name for uploaded_file in uploaded_files]
+                        suffixes = [file_suffix(filename) for filename in filenames]
+                        texts = asyncio.run(extract_uploaded_texts(uploaded_files, suffixes))
+                        
+                        # Metadata generation is pure CPU work, so fan it out across cores
+                        results = generate_metadata_batch(texts, filenames, suffixes)
+                        
+                        display_batch_results(results)
+                        
+                    except Exception as e:
+                        st.error(f"Error processing files: {str(e)}")
     
     elif processing_mode == "Text Input":
         st.header("📝 Text Input")
@@ -432,5 +670,35 @@ def display_metadata_results(metadata, text_preview):
     with st.expander("🔍 View Raw JSON Data"):
         st.json(metadata)
 
+def display_batch_results(results):
+    """Display metadata for several documents as a summary table"""
+    st.success(f"✅ Metadata generated for {len(results)} files!")
+    
+    st.dataframe([
+        {
+            'Filename': metadata['basic_info']['filename'],
+            'Document Type': metadata['content_analysis']['document_type'],
+            'Word Count': metadata['content_analysis']['word_count'],
+            'Readability Score': metadata['content_analysis']['readability_score'],
+            'Key Topics': ", ".join(metadata['semantic_data']['key_topics'])
+        }
+        for metadata in results
+    ])
+    
+    # Download section
+    st.markdown("---")
+    st.subheader("💾 Download Results")
+    st.download_button(
+        label="📄 Download All (JSON)",
+        data=json.dumps(results, indent=2),
+        file_name="metadata_batch.json",
+        mime="application/json"
+    )
+    
+    # Per-file raw JSON (collapsible)
+    for metadata in results:
+        with st.expander(f"🔍 {metadata['basic_info']['filename']}"):
+            st.json(metadata)
+
 if __name__ == "__main__":
     main()